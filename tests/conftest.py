@@ -0,0 +1,286 @@
+"""Shared test bootstrap: stub the bridge's third-party imports once, then import it.
+
+pytest loads this first; unittest/standalone runs reach it via ``from conftest import bridge``.
+"""
+import asyncio
+import contextlib
+import functools
+from pathlib import Path
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def install_test_stubs():
+    # fastapi + middleware
+    fastapi = types.ModuleType("fastapi")
+
+    class HTTPException(Exception):
+        def __init__(self, status_code=500, detail=""):
+            self.status_code = status_code
+            self.detail = detail
+            super().__init__(detail)
+
+    class FastAPI:
+        def add_middleware(self, *args, **kwargs):
+            return None
+        def get(self, *args, **kwargs):
+            return lambda fn: fn
+        def post(self, *args, **kwargs):
+            return lambda fn: fn
+        def on_event(self, *args, **kwargs):
+            return lambda fn: fn
+
+    class Request:
+        async def json(self):
+            return {}
+
+    class APIRouter:
+        pass
+
+    fastapi.FastAPI = FastAPI
+    fastapi.HTTPException = HTTPException
+    fastapi.Request = Request
+    fastapi.APIRouter = APIRouter
+
+    cors_mod = types.ModuleType("fastapi.middleware.cors")
+    class CORSMiddleware:
+        pass
+    cors_mod.CORSMiddleware = CORSMiddleware
+
+    responses_mod = types.ModuleType("fastapi.responses")
+    class JSONResponse(dict):
+        pass
+    responses_mod.JSONResponse = JSONResponse
+
+    pydantic_mod = types.ModuleType("pydantic")
+    class BaseModel:
+        pass
+    def Field(default=None, **kwargs):
+        return default
+    pydantic_mod.BaseModel = BaseModel
+    pydantic_mod.Field = Field
+
+    uvicorn_mod = types.ModuleType("uvicorn")
+    uvicorn_mod.run = lambda *a, **k: None
+
+    httpx_mod = types.ModuleType("httpx")
+    class AsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+        async def __aenter__(self):
+            return self
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+        async def post(self, *args, **kwargs):
+            raise NotImplementedError
+        async def get(self, *args, **kwargs):
+            raise NotImplementedError
+    class Limits:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+    class TimeoutException(Exception):
+        pass
+    httpx_mod.AsyncClient = AsyncClient
+    httpx_mod.Limits = Limits
+    httpx_mod.TimeoutException = TimeoutException
+
+    sse_root = types.ModuleType("sse_starlette")
+    sse_mod = types.ModuleType("sse_starlette.sse")
+    class EventSourceResponse:
+        def __init__(self, generator):
+            self.generator = generator
+    sse_mod.EventSourceResponse = EventSourceResponse
+
+    pil_mod = types.ModuleType("PIL")
+    pil_mod.Image = object
+    pil_mod.ImageDraw = object
+    pil_mod.ImageFilter = object
+
+    # Assigned, not setdefault: a real module imported earlier must not shadow the stub
+    sys.modules["fastapi"] = fastapi
+    sys.modules["fastapi.middleware.cors"] = cors_mod
+    sys.modules["fastapi.responses"] = responses_mod
+    sys.modules["pydantic"] = pydantic_mod
+    sys.modules["uvicorn"] = uvicorn_mod
+    sys.modules["httpx"] = httpx_mod
+    sys.modules["sse_starlette"] = sse_root
+    sys.modules["sse_starlette.sse"] = sse_mod
+    sys.modules["PIL"] = pil_mod
+
+
+# Only once per process, however many test modules import this
+if "flux_lora_bridge" not in sys.modules:
+    install_test_stubs()
+import flux_lora_bridge as bridge
+
+
+# ---------------------------------------------------------------------------
+# Shared event loop for async tests
+# ---------------------------------------------------------------------------
+
+class SharedLoopAsyncTestCase(unittest.TestCase):
+    """IsolatedAsyncioTestCase minus the per-test loop: every test in the module shares one loop."""
+
+    _loop = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if SharedLoopAsyncTestCase._loop is None or SharedLoopAsyncTestCase._loop.is_closed():
+            SharedLoopAsyncTestCase._loop = asyncio.new_event_loop()
+
+    def _callTestMethod(self, method):
+        if asyncio.iscoroutinefunction(method):
+            self._loop.run_until_complete(method())
+        else:
+            method()
+
+
+def tearDownModule():
+    """Import this into each test module so unittest closes the shared loop after it."""
+    loop = SharedLoopAsyncTestCase._loop
+    if loop is not None and not loop.is_closed():
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+# ---------------------------------------------------------------------------
+# HTTP fakes
+# ---------------------------------------------------------------------------
+
+class FakeResponse:
+    __slots__ = ("status_code", "_json", "content", "text", "headers")
+
+    def __init__(self, status_code=200, json_data=None, content=b"", text="", headers=None):
+        self.status_code = status_code
+        self._json = json_data if json_data is not None else {}
+        self.content = content
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        return self._json
+
+    async def aiter_bytes(self):
+        yield self.content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}: {self.text}")
+
+
+@functools.lru_cache(maxsize=None)
+def ok_response(content):
+    """Shared 200 response for a body; FakeResponse is never mutated, so one per fixture is enough."""
+    return FakeResponse(200, content=content)
+
+
+class FakeAsyncClient:
+    """Stands in for the bridge's shared httpx client; routes are per instance, keyed by (method, url)."""
+
+    is_closed = False
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.routes = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *a):
+        return False
+
+    def set_route(self, method, url, response):
+        self.routes[(method, url)] = response
+
+    async def post(self, url, json=None, headers=None, timeout=None):
+        return self.routes[("POST", url)]
+
+    async def get(self, url, headers=None, timeout=None):
+        return self.routes[("GET", url)]
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method, url, headers=None, timeout=None):
+        yield self.routes[(method, url)]
+
+
+def fake_together(return_value):
+    """Together SDK stand-in whose images.generate(**kwargs) returns `return_value`."""
+    return types.SimpleNamespace(images=types.SimpleNamespace(generate=lambda **kwargs: return_value))
+
+
+# Shared, read-only generate() params: a provider that mutates them fails loudly
+GEN_PARAMS = types.MappingProxyType({"steps": 1, "cfg_scale": 1, "width": 512, "height": 512, "seed": 42})
+
+
+# ---------------------------------------------------------------------------
+# txt2img harness: fake provider clients behind the real handler
+# ---------------------------------------------------------------------------
+
+FAKE_JPEG = b'\xff\xd8\xff\xe0' + b'\x00' * 100
+
+
+def make_request(**overrides):
+    """txt2img request with the fields the handler reads; a seed of 7 unless overridden."""
+    fields = {
+        "prompt": "a lighthouse at dusk",
+        "negative_prompt": "",
+        "steps": 4,
+        "cfg_scale": 3.5,
+        "width": 512,
+        "height": 512,
+        "seed": 7,
+        "visible_characters": [],
+        "character_prompts": {},
+    }
+    fields.update(overrides)
+    return types.SimpleNamespace(**fields)
+
+
+class FakeProviderClient:
+    """Counts generate() calls; raises `error` instead of returning an image when set.
+
+    `outcomes` overrides `error` call by call (None means succeed), and a `gate`
+    event holds every call until the test sets it.
+    """
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.outcomes = []
+        self.gate = None
+
+    async def generate(self, prompt, negative_prompt, loras, params):
+        self.calls += 1
+        error = self.outcomes.pop(0) if self.outcomes else self.error
+        if self.gate is not None:
+            await self.gate.wait()
+        if error is not None:
+            raise error
+        return FAKE_JPEG
+
+
+class Txt2ImgTestCase(SharedLoopAsyncTestCase):
+    """Runs txt2img against fake provider clients, with fresh cache and provider state."""
+
+    def setUp(self):
+        self.clients = {p: FakeProviderClient() for p in ("runware", "wavespeed", "fal", "together")}
+        patchers = [
+            mock.patch.dict(bridge.clients, self.clients),
+            mock.patch.object(bridge, "provider_state", bridge.ProviderState()),
+            mock.patch.object(bridge, "_IMAGE_CACHE", bridge.TTLCache(maxsize=8, ttl=300)),
+            mock.patch.object(bridge, "Txt2ImgResponse", dict),
+            mock.patch.multiple(
+                bridge.Config, ENABLE_SUMMARIZATION=False, MULTI_CHAR_ENABLED=False, IMAGE_CACHE_SIZE=8
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def total_calls(self):
+        return sum(c.calls for c in self.clients.values())
@@ -0,0 +1,136 @@
+"""
+Tests for the bridge's request pacing: `_post_with_retry` (which responses are
+retried, how long it waits between attempts, and when it gives up) and the
+`_poll_delays` schedule used by the job-polling providers.
+
+`asyncio.sleep` is replaced so the backoff delays are recorded instead of slept,
+and jitter is pinned to zero so the expected delays are exact.
+"""
+from pathlib import Path
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from conftest import FakeResponse, SharedLoopAsyncTestCase, bridge, tearDownModule
+
+
+URL = "https://api.example.test/v1"
+
+
+class ScriptedClient:
+    """post() returns (or raises) the next item of `script`, recording each call."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def post(self, url, json=None, headers=None, timeout=None):
+        self.calls += 1
+        item = self.script.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+
+class TestPostWithRetry(SharedLoopAsyncTestCase):
+
+    def setUp(self):
+        self.delays = []
+
+        async def fake_sleep(delay):
+            self.delays.append(delay)
+
+        for patcher in (
+            mock.patch.object(bridge.asyncio, "sleep", fake_sleep),
+            mock.patch.object(bridge.random, "random", return_value=0.0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def post(self, client, **kwargs):
+        return await bridge._post_with_retry(client, URL, json={}, headers={}, **kwargs)
+
+    async def test_success_is_returned_without_retry(self):
+        client = ScriptedClient(FakeResponse(200))
+        resp = await self.post(client)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(self.delays, [])
+
+    async def test_retryable_status_backs_off_exponentially(self):
+        client = ScriptedClient(FakeResponse(503), FakeResponse(502), FakeResponse(200))
+        resp = await self.post(client, base=1.0)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(self.delays, [1.0, 2.0])
+
+    async def test_non_retryable_status_is_returned_immediately(self):
+        client = ScriptedClient(FakeResponse(400), FakeResponse(200))
+        resp = await self.post(client)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(client.calls, 1)
+
+    async def test_last_retryable_response_is_returned_when_attempts_run_out(self):
+        client = ScriptedClient(FakeResponse(429), FakeResponse(429), FakeResponse(429))
+        resp = await self.post(client, max_attempts=3)
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(len(self.delays), 2)
+
+    async def test_retry_after_header_overrides_backoff(self):
+        client = ScriptedClient(FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(200))
+        await self.post(client)
+        self.assertEqual(self.delays, [7.0])
+
+    async def test_retry_after_is_capped(self):
+        client = ScriptedClient(FakeResponse(429, headers={"Retry-After": "3600"}), FakeResponse(200))
+        await self.post(client, cap=30.0)
+        self.assertEqual(self.delays, [30.0])
+
+    async def test_unparseable_retry_after_falls_back_to_backoff(self):
+        client = ScriptedClient(
+            FakeResponse(503, headers={"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}), FakeResponse(200)
+        )
+        await self.post(client, base=1.0)
+        self.assertEqual(self.delays, [1.0])
+
+    async def test_timeout_is_retried(self):
+        client = ScriptedClient(bridge.httpx.TimeoutException("slow"), FakeResponse(200))
+        resp = await self.post(client)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(client.calls, 2)
+
+    async def test_timeout_on_last_attempt_is_raised(self):
+        client = ScriptedClient(*(bridge.httpx.TimeoutException("slow") for _ in range(2)))
+        with self.assertRaises(bridge.httpx.TimeoutException):
+            await self.post(client, max_attempts=2)
+        self.assertEqual(client.calls, 2)
+
+
+class TestPollDelays(unittest.TestCase):
+
+    def test_delays_ramp_up_to_two_seconds(self):
+        delays = [delay for _, delay in bridge._poll_delays(60.0)]
+        self.assertEqual(delays[:3], [0.25, 0.375, 0.5625])
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(max(delays), 2.0)
+
+    def test_attempts_are_numbered_from_zero(self):
+        attempts = [attempt for attempt, _ in bridge._poll_delays(5.0)]
+        self.assertEqual(attempts, list(range(len(attempts))))
+
+    def test_total_sleep_stays_within_budget(self):
+        for budget in (0.5, 3.0, bridge.POLL_MAX_WAIT):
+            with self.subTest(budget=budget):
+                total = sum(delay for _, delay in bridge._poll_delays(budget))
+                self.assertLessEqual(total, budget)
+                # One more 2s poll would have crossed the budget
+                self.assertGreater(total + 2.0, budget)
+
+    def test_budget_smaller_than_first_delay_polls_never(self):
+        self.assertEqual(list(bridge._poll_delays(0.1)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
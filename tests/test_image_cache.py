@@ -0,0 +1,135 @@
+"""
+Tests for the fixed-seed txt2img result cache.
+
+Only a caller-chosen seed makes an image reproducible, so only those requests
+may be answered from `_IMAGE_CACHE`; seed -1 must always reach a provider.
+Identical fixed-seed requests that overlap share one generation through
+`_IMAGE_INFLIGHT`.
+"""
+import asyncio
+from pathlib import Path
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from conftest import Txt2ImgTestCase, bridge, make_request, tearDownModule
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        cache = bridge.TTLCache(maxsize=4, ttl=10)
+        with mock.patch.object(bridge.time, "monotonic", return_value=100.0):
+            cache.set("k", "v")
+        with mock.patch.object(bridge.time, "monotonic", return_value=109.0):
+            self.assertEqual(cache.get("k"), "v")
+        with mock.patch.object(bridge.time, "monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = bridge.TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+
+class TestFixedSeedImageCache(Txt2ImgTestCase):
+
+    async def test_fixed_seed_repeat_is_served_from_cache(self):
+        first = await bridge.txt2img(make_request())
+        second = await bridge.txt2img(make_request())
+        self.assertEqual(self.total_calls(), 1)
+        self.assertNotIn("cache_hit", first["parameters"])
+        self.assertTrue(second["parameters"]["cache_hit"])
+        self.assertEqual(second["images"], first["images"])
+
+    async def test_random_seed_is_never_cached(self):
+        await bridge.txt2img(make_request(seed=-1))
+        await bridge.txt2img(make_request(seed=-1))
+        self.assertEqual(self.total_calls(), 2)
+        self.assertEqual(len(bridge._IMAGE_CACHE), 0)
+
+    async def test_different_seed_misses(self):
+        await bridge.txt2img(make_request(seed=7))
+        await bridge.txt2img(make_request(seed=8))
+        self.assertEqual(self.total_calls(), 2)
+
+    async def test_cache_disabled_by_zero_size(self):
+        bridge.Config.IMAGE_CACHE_SIZE = 0
+        await bridge.txt2img(make_request())
+        await bridge.txt2img(make_request())
+        self.assertEqual(self.total_calls(), 2)
+
+    async def test_failed_generation_is_not_cached(self):
+        for client in self.clients.values():
+            client.error = RuntimeError("provider down")
+        with self.assertRaises(bridge.HTTPException):
+            await bridge.txt2img(make_request())
+        self.assertEqual(len(bridge._IMAGE_CACHE), 0)
+
+
+class TestInFlightCoalescing(Txt2ImgTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.runware = self.clients["runware"]
+        self.runware.gate = asyncio.Event()
+
+    async def start(self, count, **overrides):
+        tasks = [asyncio.ensure_future(bridge.txt2img(make_request(**overrides))) for _ in range(count)]
+        # Let every request reach the provider call or the in-flight wait
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return tasks
+
+    async def test_identical_requests_share_one_generation(self):
+        tasks = await self.start(3)
+        self.runware.gate.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(self.total_calls(), 1)
+        self.assertEqual([r["parameters"].get("cache_hit") for r in results], [None, True, True])
+        self.assertEqual(bridge._IMAGE_INFLIGHT, {})
+
+    async def test_random_seed_requests_are_not_coalesced(self):
+        tasks = await self.start(2, seed=-1)
+        self.assertEqual(bridge._IMAGE_INFLIGHT, {})
+        self.runware.gate.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(self.total_calls(), 2)
+
+    async def test_waiter_generates_itself_when_leader_fails(self):
+        for name in ("wavespeed", "fal", "together"):
+            self.clients[name].error = RuntimeError("provider down")
+        self.runware.outcomes = [RuntimeError("runware down")]
+        leader, waiter = await self.start(2)
+        self.runware.gate.set()
+        with self.assertRaises(bridge.HTTPException):
+            await leader
+        result = await waiter
+        self.assertEqual(self.runware.calls, 2)
+        self.assertNotIn("cache_hit", result["parameters"])
+        self.assertEqual(bridge._IMAGE_INFLIGHT, {})
+
+    async def test_waiter_generates_itself_when_leader_is_cancelled(self):
+        leader, waiter = await self.start(2)
+        leader.cancel()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        self.runware.gate.set()
+        result = await waiter
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.runware.calls, 2)
+        self.assertNotIn("cache_hit", result["parameters"])
+        self.assertEqual(bridge._IMAGE_INFLIGHT, {})
+        # A cancelled attempt is not a provider failure
+        self.assertEqual(bridge.provider_state.failure_rate["runware"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for LoRAManager's hot reload: master_lora_dict.json is re-read only when
+its mtime changes, a broken edit keeps the previous dict, and a reload (or
+/reset) drops memoized keyword matches. Editing a LoRA also changes the
+fixed-seed image cache key, so the old image isn't served.
+"""
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from conftest import bridge
+
+
+def lora(name, keywords):
+    return {
+        "name": name,
+        "url": f"https://huggingface.co/example/{name}.safetensors",
+        "weight": 0.8,
+        "category": "style",
+        "keywords": keywords,
+        "trigger_words": [],
+        "prepend_prompt": "",
+        "append_prompt": "",
+        "negative_prompt": "",
+    }
+
+
+class TestLoRAManagerReload(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "loras.json")
+        self.mtime = 1_000_000.0
+        self.write({"lighthouse": lora("lighthouse", ["lighthouse"])})
+        self.manager = bridge.LoRAManager(self.path)
+
+    def write(self, loras=None, raw=None):
+        """Rewrite the dict file and step its mtime, so every write is a visible change."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(raw if raw is not None else json.dumps({"config": {}, "loras": loras}))
+        self.mtime += 10
+        os.utime(self.path, (self.mtime, self.mtime))
+
+    def matched_ids(self, prompt):
+        return [m["id"] for m in self.manager.match_loras_by_keywords(prompt, "")]
+
+    def test_unchanged_file_is_not_reparsed(self):
+        self.assertFalse(self.manager.reload_if_changed())
+
+    def test_changed_file_is_reloaded(self):
+        self.write({
+            "lighthouse": lora("lighthouse", ["lighthouse"]),
+            "harbor": lora("harbor", ["harbor"]),
+        })
+        self.assertTrue(self.manager.reload_if_changed())
+        self.assertEqual(self.manager.lora_count, 2)
+        self.assertFalse(self.manager.reload_if_changed())
+
+    def test_broken_edit_keeps_previous_dict_until_next_change(self):
+        self.write(raw='{"config": {}, "loras": {')
+        self.assertFalse(self.manager.reload_if_changed())
+        self.assertEqual(self.matched_ids("a lighthouse"), ["lighthouse"])
+        self.write({"harbor": lora("harbor", ["harbor"])})
+        self.assertTrue(self.manager.reload_if_changed())
+        self.assertEqual(self.matched_ids("a harbor"), ["harbor"])
+
+    def test_reload_drops_memoized_matches(self):
+        self.assertEqual(self.matched_ids("a lighthouse"), ["lighthouse"])
+        self.write({"beacon": lora("beacon", ["lighthouse"])})
+        self.assertEqual(self.matched_ids("a lighthouse"), ["beacon"])
+
+    def test_editing_a_lora_changes_the_image_cache_key(self):
+        params = {"steps": 4, "cfg_scale": 3.5, "width": 512, "height": 512, "seed": 7}
+
+        def key():
+            matched = self.manager.match_loras_by_keywords("a lighthouse", "")
+            return bridge._image_cache_key("a lighthouse", "", params, matched)
+
+        original = key()
+        edited = lora("lighthouse", ["lighthouse"])
+        edited["url"] = "https://huggingface.co/example/lighthouse-v2.safetensors"
+        self.write({"lighthouse": edited})
+        new_url = key()
+        edited["weight"] = 0.5
+        self.write({"lighthouse": edited})
+        new_weight = key()
+        self.assertEqual(len({original, new_url, new_weight}), 3)
+
+    def test_memoized_match_returns_fresh_list(self):
+        first = self.manager.match_loras_by_keywords("a lighthouse", "")
+        first.clear()
+        self.assertEqual(self.matched_ids("a lighthouse"), ["lighthouse"])
+
+    def test_match_memo_ignores_summary_cache_ttl(self):
+        with mock.patch.object(bridge.Config, "SUMMARY_CACHE_TTL", 0):
+            manager = bridge.LoRAManager(self.path)
+        with mock.patch.object(manager, "_match_uncached", wraps=manager._match_uncached) as uncached:
+            manager.match_loras_by_keywords("a lighthouse", "")
+            manager.match_loras_by_keywords("a lighthouse", "")
+        self.assertEqual(uncached.call_count, 1)
+
+    def test_clear_match_cache_reports_dropped_entries(self):
+        self.matched_ids("a lighthouse")
+        self.matched_ids("two lighthouses")
+        self.assertEqual(self.manager.clear_match_cache(), 2)
+        self.assertEqual(self.manager.clear_match_cache(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
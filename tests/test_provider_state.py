@@ -0,0 +1,85 @@
+"""
+Tests for ProviderState: a provider whose failure rate reaches
+PROVIDER_DEMOTE_FAILURE_RATE is tried after the healthy ones, and ages back
+into its configured slot after PROVIDER_AGE_SECONDS without failing.
+"""
+from pathlib import Path
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from conftest import bridge
+
+
+DEFAULT_ORDER = ["runware", "wavespeed", "fal", "together"]
+
+
+class TestProviderState(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        for patcher in (
+            mock.patch.object(bridge.time, "monotonic", lambda: self.now),
+            mock.patch.multiple(bridge.Config, PROVIDER_DEMOTE_FAILURE_RATE=0.5, PROVIDER_AGE_SECONDS=120),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.state = bridge.ProviderState()
+
+    def fail(self, provider, times=1):
+        for _ in range(times):
+            self.state.record_start(provider)
+            self.state.record_result(provider, False, 1.0)
+
+    def test_configured_order_when_healthy(self):
+        self.assertEqual(self.state.get_provider_list(), DEFAULT_ORDER)
+
+    def test_single_failure_does_not_demote(self):
+        self.fail("runware")
+        self.assertEqual(self.state.get_provider_list(), DEFAULT_ORDER)
+
+    def test_repeated_failures_demote_behind_healthy_providers(self):
+        self.fail("runware", times=2)
+        self.assertEqual(self.state.get_provider_list(), ["wavespeed", "fal", "together", "runware"])
+        self.assertTrue(self.state.health()["runware"]["demoted"])
+
+    def test_demoted_providers_keep_configured_order(self):
+        self.fail("fal", times=2)
+        self.fail("runware", times=2)
+        self.assertEqual(self.state.get_provider_list(), ["wavespeed", "together", "runware", "fal"])
+
+    def test_demoted_provider_ages_back_in(self):
+        self.fail("runware", times=2)
+        self.now += 119
+        self.assertEqual(self.state.get_provider_list()[-1], "runware")
+        self.now += 2
+        self.assertEqual(self.state.get_provider_list(), DEFAULT_ORDER)
+
+    def test_successes_bring_failure_rate_back_under_threshold(self):
+        self.fail("runware", times=2)
+        for _ in range(2):
+            self.state.record_start("runware")
+            self.state.record_result("runware", True, 2.0)
+        self.assertLess(self.state.failure_rate["runware"], 0.5)
+        self.assertEqual(self.state.get_provider_list(), DEFAULT_ORDER)
+
+    def test_latency_ewma_tracks_successes_only(self):
+        self.state.record_start("fal")
+        self.state.record_result("fal", True, 10.0)
+        self.fail("fal")
+        self.assertEqual(self.state.ewma_latency["fal"], 10.0)
+        self.state.record_start("fal")
+        self.state.record_result("fal", True, 20.0)
+        self.assertAlmostEqual(self.state.ewma_latency["fal"], 13.0)
+
+    def test_cancel_releases_slot_without_counting_a_failure(self):
+        self.state.record_start("runware")
+        self.assertEqual(self.state.active["runware"], 1)
+        self.state.record_cancel("runware")
+        self.assertEqual(self.state.active["runware"], 0)
+        self.assertEqual(self.state.failure_rate["runware"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
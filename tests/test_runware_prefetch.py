@@ -0,0 +1,106 @@
+"""
+Tests for the Runware LoRA prefetch that runs alongside the DeepSeek summary.
+
+The prefetch is only a warm-up: it must never hold up the summary or the
+provider chain, and it is skipped when Runware is not the provider tried first.
+"""
+import asyncio
+from pathlib import Path
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from conftest import FakeProviderClient, Txt2ImgTestCase, bridge, make_request, tearDownModule
+
+
+class FakeRunwareClient(FakeProviderClient):
+    """Adds resolve_loras(), which blocks until `release` is set unless `resolve_error` is."""
+
+    def __init__(self):
+        super().__init__()
+        self.resolves = 0
+        self.resolve_cancelled = False
+        self.resolve_error = None
+        self.release = asyncio.Event()
+
+    async def resolve_loras(self, loras):
+        self.resolves += 1
+        if self.resolve_error is not None:
+            raise self.resolve_error
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.resolve_cancelled = True
+            raise
+        return loras
+
+
+class TestRunwarePrefetch(Txt2ImgTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.runware = self.clients["runware"] = FakeRunwareClient()
+        bridge.clients["runware"] = self.runware
+        self.summaries = 0
+        self.summary_gate = None
+        self.summary_cancelled = False
+
+        async def fake_summarize(prompt, maxlength=300, required_names=None):
+            self.summaries += 1
+            try:
+                if self.summary_gate is not None:
+                    await self.summary_gate.wait()
+            except asyncio.CancelledError:
+                self.summary_cancelled = True
+                raise
+            return prompt
+
+        for patcher in (
+            mock.patch.multiple(bridge.Config, ENABLE_SUMMARIZATION=True, RUNWARE_API_KEY="rk"),
+            mock.patch.object(bridge.deepseek_summarizer, "summarize_prompt", fake_summarize),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request(self):
+        # Random seed: every call reaches the providers instead of the image cache
+        return make_request(prompt="nimya walking on the beach", seed=-1)
+
+    async def test_slow_resolve_does_not_delay_generation(self):
+        result = await asyncio.wait_for(bridge.txt2img(self.request()), timeout=1.0)
+        self.assertEqual(result["parameters"]["provider"], "runware")
+        self.assertEqual(self.runware.resolves, 1)
+        await asyncio.sleep(0)
+        self.assertTrue(self.runware.resolve_cancelled)
+
+    async def test_failing_resolve_does_not_block_fallback(self):
+        self.runware.resolve_error = RuntimeError("upload rejected")
+        self.runware.error = RuntimeError("runware down")
+        result = await asyncio.wait_for(bridge.txt2img(self.request()), timeout=1.0)
+        self.assertEqual(result["parameters"]["provider"], "wavespeed")
+        self.assertEqual(self.summaries, 1)
+
+    async def test_demoted_runware_is_not_prefetched(self):
+        for _ in range(3):
+            bridge.provider_state.record_start("runware")
+            bridge.provider_state.record_result("runware", False, 1.0)
+        result = await asyncio.wait_for(bridge.txt2img(self.request()), timeout=1.0)
+        self.assertEqual(self.runware.resolves, 0)
+        self.assertEqual(result["parameters"]["provider"], "wavespeed")
+
+    async def test_cancelled_request_cancels_summary_and_prefetch(self):
+        self.summary_gate = asyncio.Event()
+        task = asyncio.ensure_future(bridge.txt2img(self.request()))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        self.assertTrue(self.summary_cancelled)
+        self.assertTrue(self.runware.resolve_cancelled)
+
+
+if __name__ == "__main__":
+    unittest.main()